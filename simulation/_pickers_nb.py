@@ -0,0 +1,53 @@
+import numpy as np
+
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+def _pick_least(closed, is_express, metric, num_items):
+    """Get the ID of the applicable checkout line with the least metric.
+
+    A line is applicable if it is open, and if it is not an express line
+    or the customer has no more than 10 items. Ties go to the line with
+    the smallest ID.
+
+    @type closed: np.ndarray[bool]
+        If each checkout line is closed.
+    @type is_express: np.ndarray[bool]
+        If each checkout line is an express line.
+    @type metric: np.ndarray[int64]
+        The value to minimize for each checkout line.
+    @type num_items: int
+        Number of grocery items the customer purchases.
+    @rtype: int
+        The ID of the picked line; -1 if no line is applicable.
+    """
+    items_ok = num_items <= 10
+    best_id = -1
+    best_metric = _INT64_MAX
+    for line_id in range(len(metric)):
+        applicable = not closed[line_id] and (
+            items_ok or not is_express[line_id])
+        value = metric[line_id] if applicable else _INT64_MAX
+        if value < best_metric:
+            best_id = line_id
+            best_metric = value
+    return best_id
+
+
+PICK_LEAST_SIGNATURE = "int64(boolean[:], boolean[:], int64[:], int64)"
+
+# Prefer the kernels compiled ahead of time by build_pickers_aot.py, which
+# load without numba or any compilation. Otherwise JIT-compile them if
+# numba is installed. Without either, the kernels are None and Utility
+# falls back to its numpy implementation.
+try:
+    from ._pickers_aot import pick_least
+except ImportError:
+    try:
+        from numba import njit
+    except ImportError:
+        pick_least = None
+    else:
+        # Compile eagerly for the one signature the pickers use, and cache
+        # the machine code on disk so later imports skip compilation.
+        pick_least = njit(PICK_LEAST_SIGNATURE, cache=True)(_pick_least)
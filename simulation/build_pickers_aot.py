@@ -0,0 +1,21 @@
+"""Compile the line picking kernels ahead of time.
+
+Run from the repository root with
+
+    python -m simulation.build_pickers_aot
+
+to build the _pickers_aot extension module next to this file. When it is
+present, the pickers use it directly, so neither numba nor JIT
+compilation is needed when the simulation runs. Building requires numba
+and a C compiler.
+"""
+import os
+from numba.pycc import CC
+from ._pickers_nb import PICK_LEAST_SIGNATURE, _pick_least
+
+cc = CC("_pickers_aot")
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+cc.export("pick_least", PICK_LEAST_SIGNATURE)(_pick_least)
+
+if __name__ == "__main__":
+    cc.compile()
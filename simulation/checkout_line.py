@@ -1,5 +1,7 @@
-from queue import Queue
-from functools import reduce
+import sys
+import numpy as np
+from collections import deque
+from .customer import Customer
 from .utility import Utility
 
 class CheckoutLine:
@@ -14,16 +16,42 @@ class CheckoutLine:
     @type type: string
         The type of this checkout line. Can be one of the following:
             "cashier", "express", "self"
-    @type queue: Queue[Customer]
+    @type type_id: int
+        The integer ID of the line type from Utility.line_type_ids;
+        -1 if the type is unknown.
+    @type queue: deque[Customer]
         A first-come-first-serve (FCFS) queue where customers wait.
     @type served: list[Customers]
-        A list of previously served customers.
+        A list of previously served customers, built from _served_stats
+        and extended as more customers are served.
     @type closed: bool
         A boolean to indicate if the checkout line is closed.
         If a line is closed, no new customers can join this line.
+        Setting it also updates the store's line_closed and open_mask.
+    @type _head: Customer
+        The customer in front of the queue; None if the queue is empty.
+    @type _service_times: deque[int]
+        The checkout time of each customer in the queue, in queue order.
+    @type _total_service_time: int
+        The sum of _service_times.
+    @type _num_items_total: int
+        The number of items purchased by the customers in the queue.
+    @type _served_stats: np.ndarray[int64], shape (capacity, 5)
+        One row of (join, begin, finish, num_items, id) per served
+        customer. Only the first _num_served rows are filled; the capacity
+        doubles when the buffer runs out.
+    @type _num_served: int
+        The number of customers recorded in _served_stats.
+    @type _served: list[Customer]
+        The Customer objects built from the first len(_served) rows of
+        _served_stats; returned by served.
+    @type _store: GroceryStore
+        The store whose per-line arrays mirror this line's state; nullable.
+    @type _closed: bool
+        If the line is closed; read and written through closed.
     """
     
-    def __init__(self, id, type, closed=False):
+    def __init__(self, id, type, closed=False, store=None):
         """Initialize a CheckoutLine with an ID and a type.
         
         @type self: CheckoutLine
@@ -34,12 +62,23 @@ class CheckoutLine:
             "express", and "self"
         @type closed: bool
             If the line is closed. Default False.
+        @type store: GroceryStore
+            The store this line belongs to, whose per-line arrays are
+            kept up to date with this line. Default None.
         @rtype: None
         """
         self.id = id
-        self.type = type
-        self.queue = Queue()
-        self.served = []
+        self.type = sys.intern(type)
+        self.type_id = Utility.line_type_ids.get(self.type, -1)
+        self._q = deque()
+        self._head = None
+        self._service_times = deque()
+        self._total_service_time = 0
+        self._num_items_total = 0
+        self._served_stats = np.empty((1024, 5), dtype=np.int64)
+        self._num_served = 0
+        self._served = []
+        self._store = store
         self.closed = closed
         
     def serve_next_customer(self):
@@ -52,9 +91,33 @@ class CheckoutLine:
         @rtype: Customer
             The customer to server, in the front of the queue.
         """
-        assert not self.is_empty(), "Error: cannot serve next customer from"  \
-        + " empty queue of line id: " + str(self.id) + "."
-        return self.queue.queue[0]
+        assert self._head is not None, "Error: cannot serve next customer" \
+        + " from empty queue of line id: " + str(self.id) + "."
+        return self._head
+    
+    def get_current_checkout_time(self):
+        """Get the checkout time of the customer in front of the queue.
+        
+        This is the time drawn when the customer joined the line, so the
+        customer checks out in exactly the time the line has accounted for.
+        
+        @type self: CheckoutLine
+        @rtype: int
+            The checkout time of the customer in front of the queue.
+        """
+        assert self._service_times, "Error: no customer in front of the" \
+        + " queue of line id: " + str(self.id) + "."
+        return self._service_times[0]
+    
+    @property
+    def queue(self):
+        """The FCFS queue of customers waiting in this line.
+        
+        @type self: CheckoutLine
+        @rtype: deque[Customer]
+            The customers in this line, the one checking out in front.
+        """
+        return self._q
     
     def queue_new_customer(self, customer):
         """Join a new customer to wait in the queue.
@@ -66,7 +129,85 @@ class CheckoutLine:
         """
         assert not self.closed, "Error: cannot accpet new customer in closed" \
         + " line id: " + str(self.id) + "."
-        self.queue.put(customer)
+        self._q.append(customer)
+        if self._head is None:
+            self._head = customer
+        checkout_time = Utility.get_checkout_time(customer, self)
+        self._service_times.append(checkout_time)
+        self._total_service_time += checkout_time
+        self._num_items_total += customer.num_items
+        self._update_store()
+    
+    def finish_current_customer(self):
+        """Remove the customer in front of the queue once they finish
+        checkout, and record them as served.
+        
+        @type self: CheckoutLine
+        @rtype: Customer
+            The customer removed from the front of the queue.
+        """
+        self._total_service_time -= self._service_times.popleft()
+        customer = self._q.popleft()
+        self._head = self._q[0] if self._q else None
+        self._num_items_total -= customer.num_items
+        if self._num_served == len(self._served_stats):
+            self._served_stats = np.resize(
+                self._served_stats, (2 * len(self._served_stats), 5))
+        self._served_stats[self._num_served] = (
+            customer.join_timestamp, customer.begin_timestamp,
+            customer.finish_timestamp, customer.num_items, customer.id)
+        self._num_served += 1
+        self._update_store()
+        return customer
+    
+    def _update_store(self):
+        """Copy the queue state of this line into the store's arrays.
+        
+        @type self: CheckoutLine
+        @rtype: None
+        """
+        store = self._store
+        if store is None:
+            return
+        store.line_num_customers[self.id] = len(self._q)
+        store.line_num_items[self.id] = self._num_items_total
+        store.line_queue_time[self.id] = self.get_queue_time()
+        store.line_queue_time_after_first[self.id] = \
+        self.get_queue_time(count_first=False)
+    
+    def get_served_stats(self):
+        """Get the timestamps and number of items of served customers.
+        
+        @type self: CheckoutLine
+        @rtype: np.ndarray[int64], shape (num_served, 5)
+            One row of (join, begin, finish, num_items, id) per served
+            customer, in the order they finished checkout.
+        """
+        return self._served_stats[:self._num_served]
+    
+    @property
+    def served(self):
+        """The previously served customers, in the order they finished.
+        
+        The Customer objects are built from the served stats the first
+        time they are asked for, so repeated accesses return the same
+        list and objects. Use get_served_stats() to read the timestamps
+        as an array instead.
+        
+        @type self: CheckoutLine
+        @rtype: list[Customer]
+            The Customer objects of the served customers.
+        """
+        customers = self._served
+        if len(customers) < self._num_served:
+            for join, begin, finish, num_items, id in \
+                self._served_stats[len(customers):self._num_served].tolist():
+                customer = Customer(id, num_items)
+                customer.join_timestamp = join
+                customer.begin_timestamp = begin
+                customer.finish_timestamp = finish
+                customers.append(customer)
+        return customers
     
     def get_num_customers(self):
         """Get the number of customers in the line.
@@ -75,7 +216,7 @@ class CheckoutLine:
         @rtype: int
             The number of customers in this line.
         """
-        return self.queue.qsize()
+        return len(self._q)
     
     def is_empty(self):
         """Get if the line has no customer waiting in the queue.
@@ -94,9 +235,7 @@ class CheckoutLine:
         @rtype: int
             The number of items in this line.
         """
-        return reduce(
-            lambda accum, customer: accum + customer.num_items,
-            self.queue.queue, 0)
+        return self._num_items_total
     
     def get_queue_time(self, count_first=True):
         """Get the expected time to wait in queue if a new customer joins.
@@ -108,14 +247,40 @@ class CheckoutLine:
         @rtype: int
             The expected queueing time in this line.
         """
-        customers = self.queue.queue
-        if len(customers) == 0:
-            return 0
-        wait_time = 0
-        start_idx = 0 if count_first else 1
-        for idx in range(start_idx, len(customers)):
-            wait_time += Utility.get_checkout_time(customers[idx], self)
-        return wait_time
+        if count_first or len(self._q) == 0:
+            return self._total_service_time
+        return self._total_service_time - self._service_times[0]
+    
+    @property
+    def closed(self):
+        """If the line is closed, so no new customers can join.
+        
+        @type self: CheckoutLine
+        @rtype: bool
+            If the line is closed.
+        """
+        return self._closed
+    
+    @closed.setter
+    def closed(self, closed):
+        """Close or open the line, and update the store's copies.
+        
+        This is the only place the store's line_closed and open_mask are
+        written, so they always agree with closed.
+        
+        @type self: CheckoutLine
+        @type closed: bool
+            If the line is closed.
+        @rtype: None
+        """
+        self._closed = closed
+        store = self._store
+        if store is not None:
+            store.line_closed[self.id] = closed
+            if closed:
+                store.open_mask &= ~(1 << self.id)
+            else:
+                store.open_mask |= 1 << self.id
     
     def close(self):
         """Close the line, so no new customers can join.
@@ -19,6 +19,9 @@ class Customer:
         The timestamp when the customer finishes checking out.
     """
     
+    __slots__ = ("id", "num_items", "join_timestamp", "begin_timestamp",
+                 "finish_timestamp")
+    
     def __init__(self, id, num_items):
         """Initialize a Customer with an ID and number of grocery items.
         
@@ -36,14 +36,14 @@ class DataGenerator:
             Two parameters used for a type of distribution.
             For "uniform", they are min and max
             For "gaussian", they are mean and std
-        @rtype str: line-separated string to represent a list of initial events.
+        @rtype list[str]: a list of initial events, one per line.
         """
         assert item_distribution in ("uniform", "gaussian"), \
         "Error: unknown item distribution type: %s." %item_distribution
         assert len(dist_params) == 2, "Error: incorrect number of parameters given."
         
-        timestamps = sorted(list(np.floor(np.random.uniform(
-            start_time, end_time, num_customers)).astype(int)))
+        timestamps = np.sort(np.floor(np.random.uniform(
+            start_time, end_time, num_customers)).astype(int))
         
         if item_distribution == "uniform":
             sampling_func = np.random.uniform
@@ -53,13 +53,10 @@ class DataGenerator:
         param1, param2 = dist_params
         items = np.round(sampling_func(param1, param2, num_customers)).astype(int)
         items[items <= 0] = 1 # at least 1 item purchased
-        items = list(items)
-        
-        lines = []
-        for timestamp, item in zip(timestamps, items):
-            lines.append("%d,join,%d" % (timestamp, item))
         
-        return lines
+        lines = np.char.add(np.char.add(timestamps.astype(str), ",join,"),
+                            items.astype(str))
+        return lines.tolist()
     
     def generate_time_varying(self, params):
         """Generate time-varying data distribution of customer arrival events.
@@ -5,7 +5,8 @@ class Event:
     
     """A generic event.
 
-    Events are organized in non-ascending order based on their timestamps.
+    Events are performed in ascending order of their timestamps; events
+    with the same timestamp are performed in the order they are scheduled.
     Subclasses of Event must implement do() because this class is abstract.
 
     === Attributes ===
@@ -27,6 +28,8 @@ class Event:
             LineOpenEvent
     """
     
+    __slots__ = ("timestamp", "customer", "line")
+    
     def __init__(self, timestamp, customer=None, line=None):
         """Initialize an Event with a given timestamp, customer, and line.
 
@@ -43,24 +46,6 @@ class Event:
         self.customer = customer
         self.line = line
 
-    def __eq__(self, other):
-        return self.timestamp == other.timestamp
-    
-    def __ne__(self, other):
-        return not self.__eq__(other)
-    
-    def __lt__(self, other):
-        return self.timestamp < other.timestamp
-    
-    def __le__(self, other):
-        return self.timestamp <= other.timestamp
-    
-    def __gt__(self, other):
-        return not self.__le__(other)
-    
-    def __ge__(self, other):
-        return not self.__lt__(other)
-    
     def do(self, store):
         """Perform this Event.
 
@@ -80,12 +65,32 @@ class Event:
         raise NotImplementedError
 
 
+def _begin_checkout(timestamp, customer, line):
+    """Begin checkout for the customer in front of the line.
+
+    Return the FinishCheckoutEvent for when the customer finishes.
+
+    @type timestamp: int
+        The timestamp when the customer begins checkout.
+    @type customer: Customer
+        The customer to checkout.
+    @type line: CheckoutLine
+        The line used for checkout.
+    @rtype: FinishCheckoutEvent
+        The event to finish checkout for the customer.
+    """
+    customer.begin_timestamp = timestamp
+    checkout_time = line.get_current_checkout_time()
+    return FinishCheckoutEvent(timestamp + checkout_time, customer, line)
+
+
 class BeginCheckoutEvent(Event):
     
     """The event to begin checkout process.
 
-    This event is generated when a new customer joins an empty checkout
-    line or when another customer in front of them finishes checkout.
+    The simulation begins checkout directly when a customer joins an
+    empty line or reaches the front of the queue, so it never schedules
+    this event itself; it is kept for custom event lists.
 
     === Attributes ===
     @type timestamp: int
@@ -96,6 +101,8 @@ class BeginCheckoutEvent(Event):
         The line associated with this event.
     """
     
+    __slots__ = ()
+    
     def do(self, store):
         """Perform this Event.
         
@@ -108,17 +115,14 @@ class BeginCheckoutEvent(Event):
         @rtype: list[Event]
             A list of events generated by performing this event.
         """
-        self.customer.begin_timestamp = self.timestamp
-        checkout_time = Utility.get_checkout_time(self.customer, self.line)
-        return [FinishCheckoutEvent(
-            self.timestamp + checkout_time, self.customer, self.line)]
+        return [_begin_checkout(self.timestamp, self.customer, self.line)]
 
     
 class FinishCheckoutEvent(Event):
     
     """The event to finish checkout process.
 
-    This event is generated when a new customer begins checkout.
+    This event is generated when a customer begins checkout.
 
     === Attributes ===
     @type timestamp: int
@@ -129,13 +133,15 @@ class FinishCheckoutEvent(Event):
         The line associated with this event.
     """
     
+    __slots__ = ()
+    
     def do(self, store):
         """Perform this Event.
         
-        Once the customer finishes checkout, if the checkout line still
-        has customers waiting in the queue, the next customer is removed
-        from the queue, and a BeginCheckoutEvent is assigned for them
-        with the same timestamp this customer finishes checkout.
+        Once the customer finishes checkout, they are removed from the
+        queue. If the checkout line still has customers waiting, the next
+        customer begins checkout with the same timestamp this customer
+        finishes, and a FinishCheckoutEvent is assigned for them.
         Otherwise, do nothing (empty list returned).
         
         @type self: FinishCheckoutEvent
@@ -143,13 +149,12 @@ class FinishCheckoutEvent(Event):
         @rtype: list[Event]
             A list of events generated by performing this event.
         """
+        line = self.line
         self.customer.finish_timestamp = self.timestamp
-        served_customer = self.line.queue.get()
-        self.line.served.append(served_customer)
-        if not self.line.is_empty():
-            next_customer = self.line.serve_next_customer()
-            return [BeginCheckoutEvent(
-                self.timestamp, next_customer, self.line)]
+        line.finish_current_customer()
+        if not line.is_empty():
+            next_customer = line.serve_next_customer()
+            return [_begin_checkout(self.timestamp, next_customer, line)]
         else:
             return []
 
@@ -167,6 +172,8 @@ class JoinCheckoutEvent(Event):
         The customer associated with this event.
     """
     
+    __slots__ = ()
+    
     def __init__(self, timestamp, customer):
         """Initialize an Event with a given timestamp and customer.
 
@@ -184,23 +191,24 @@ class JoinCheckoutEvent(Event):
         
         Once the customer joins, a checkout line is then picked.
         The customer is added to the checkout line queue.
-        If the picked line is empty, a BeginCheckoutEvent will also be
-        generated for this customer with the same timestamp as this event.
+        If the picked line is empty, the customer begins checkout with the
+        same timestamp as this event, and a FinishCheckoutEvent is
+        generated for them.
         
         @type self: JoinCheckoutEvent
         @type store: GroceryStore
         @rtype: list[Event]
             A list of events generated by performing this event.
         """
-        self.customer.join_timestamp = self.timestamp
-        self.line = Utility.pick_checkout_line(self.customer, store)
-        if self.line.is_empty():
+        customer = self.customer
+        customer.join_timestamp = self.timestamp
+        line = self.line = Utility.pick_checkout_line(customer, store)
+        if line.is_empty():
             # IMPORTANT: do not try to remove/simplify the following line
-            self.line.queue_new_customer(self.customer)
-            return [BeginCheckoutEvent(
-                self.timestamp, self.customer, self.line)]
+            line.queue_new_customer(customer)
+            return [_begin_checkout(self.timestamp, customer, line)]
         else:
-            self.line.queue_new_customer(self.customer)
+            line.queue_new_customer(customer)
             return []
 
 
@@ -216,6 +224,8 @@ class LineOpenEvent(Event):
         The line associated with this event.
     """
     
+    __slots__ = ()
+    
     def __init__(self, timestamp, line):
         """Initialize an Event with a given timestamp and line.
 
@@ -254,6 +264,8 @@ class LineCloseEvent(Event):
         The line associated with this event.
     """
     
+    __slots__ = ()
+    
     def __init__(self, timestamp, line):
         """Initialize an Event with a given timestamp and line.
 
@@ -296,25 +308,43 @@ def create_event_list(initial_events_str, store):
     """
     events = []
     curr_customer_id = 0
-    for idx, line in enumerate(initial_events_str.strip().split("\n")):
+    lines_by_id = store._lines_by_id
+    for idx, row in enumerate(initial_events_str.strip().split("\n")):
+        fields = row.split(",")
+        if len(fields) != 3:
+            raise _parse_error(idx, "expected 3 fields")
+        timestamp, event_type, param = fields
         try:
-            timestamp, event_type, param = line.split(",")
             timestamp, param = int(timestamp), int(param)
-            if event_type == "join":
-                customer = Customer(curr_customer_id, param)
-                curr_customer_id += 1
-                event = JoinCheckoutEvent(timestamp, customer)
-            elif event_type in ("open", "close"):
-                line = list(filter(lambda line: line.id == param,
-                              store.lines))[0]
-                if event_type == "open":
-                    event = LineOpenEvent(timestamp, line)
-                else:
-                    event = LineCloseEvent(timestamp, line)
+        except ValueError:
+            raise _parse_error(idx, "expected an integer") from None
+        event_type = event_type.strip()
+        if event_type == "join":
+            customer = Customer(curr_customer_id, param)
+            curr_customer_id += 1
+            event = JoinCheckoutEvent(timestamp, customer)
+        elif event_type == "open" or event_type == "close":
+            line = lines_by_id.get(param)
+            if line is None:
+                raise _parse_error(idx, "unknown line id")
+            if event_type == "open":
+                event = LineOpenEvent(timestamp, line)
             else:
-                raise ValueError("Error: unknown event type '%s'."
-                                 % event_type)
-        except:
-            raise ValueError("Error: parse error on line %d." % idx)
+                event = LineCloseEvent(timestamp, line)
+        else:
+            raise _parse_error(idx, "unknown event type")
         events.append(event)
     return events
+
+
+def _parse_error(idx, reason):
+    """Make the ValueError for an invalid row of the initial events.
+
+    @type idx: int
+        The index of the invalid row.
+    @type reason: str
+        Why the row is invalid.
+    @rtype: ValueError
+        The error to raise.
+    """
+    return ValueError("Error: parse error on line %d: %s." % (idx, reason))
@@ -1,9 +1,16 @@
+import numpy as np
 from .checkout_line import CheckoutLine
 
 class GroceryStore:
     """A grocery store.
 
     A grocery store contains different types of checkout lines.
+    
+    The state the line picking schemes look at is mirrored into one numpy
+    array per field, indexed by line ID, so a scheme can compare every
+    line in a single vectorized pass. The line types are fixed when the
+    store is built; the lines keep the other arrays up to date as
+    customers join and leave and as lines open and close.
 
     === Attributes ===
     @type lines: list[CheckoutLine]
@@ -13,6 +20,30 @@ class GroceryStore:
         Particularly useful for round-robin assignment scheme.
     @type total_lines: int
         The number of checkout lines in total.
+    @type line_closed: np.ndarray[bool]
+        If each checkout line is closed. Written only by the
+        CheckoutLine.closed setter.
+    @type line_is_express: np.ndarray[bool]
+        If each checkout line is an express line.
+    @type line_not_express: np.ndarray[bool]
+        If each checkout line is not an express line, i.e. if customers
+        with more than 10 items may use it.
+    @type line_num_customers: np.ndarray[int64]
+        The number of customers in each checkout line.
+    @type line_num_items: np.ndarray[int64]
+        The number of items in each checkout line.
+    @type line_queue_time: np.ndarray[int64]
+        The checkout time of all customers in each checkout line.
+    @type line_queue_time_after_first: np.ndarray[int64]
+        The checkout time of all customers in each checkout line except
+        the one in front.
+    @type open_mask: int
+        A bitmask of the open checkout lines; bit i is set if the line
+        with ID i is open. Written only by the CheckoutLine.closed setter.
+    @type non_express_mask: int
+        A bitmask of the checkout lines that are not express lines.
+    @type _lines_by_id: dict[int, CheckoutLine]
+        A mapping from each line ID to its checkout line.
     """
     
     def __init__(self, line_counts):
@@ -24,11 +55,28 @@ class GroceryStore:
                 "cashier_count", "express_count", "self_count"
         @rtype: None
         """
+        num_lines = sum(line_counts.values())
+        self.line_closed = np.zeros(num_lines, dtype=bool)
+        self.line_num_customers = np.zeros(num_lines, dtype=np.int64)
+        self.line_num_items = np.zeros(num_lines, dtype=np.int64)
+        self.line_queue_time = np.zeros(num_lines, dtype=np.int64)
+        self.line_queue_time_after_first = np.zeros(
+            num_lines, dtype=np.int64)
+        self.open_mask = 0
+        
         self.lines = []
         line_id = 0
         for line_type, line_count in sorted(line_counts.items()):
             for _ in range(line_count):
-                self.lines.append(CheckoutLine(line_id, line_type))
+                self.lines.append(
+                    CheckoutLine(line_id, line_type, store=self))
                 line_id += 1
         self.last_line_id = line_id - 1
         self.total_lines = line_id
+        self._lines_by_id = {line.id: line for line in self.lines}
+        self.line_is_express = np.array(
+            [line.type == "express" for line in self.lines], dtype=bool)
+        self.line_not_express = ~self.line_is_express
+        self.non_express_mask = 0
+        for line_id in np.flatnonzero(self.line_not_express).tolist():
+            self.non_express_mask |= 1 << line_id
@@ -1,7 +1,91 @@
+import heapq
+import itertools
 import numpy as np
-from queue import PriorityQueue
 from .grocery_store import GroceryStore
 from .event import *
+from .utility import Utility
+
+class EventQueue:
+    """A priority queue of events ordered by timestamp.
+
+    Events are stored in a binary heap as (timestamp, seq, event) tuples,
+    so the heap compares plain integers and never compares events.
+    The sequence number breaks ties between events sharing a timestamp
+    in first-in-first-out order.
+
+    === Attributes ===
+    @type _heap: list[tuple(int, int, Event)]
+        The binary heap of scheduled events.
+    @type _seq: itertools.count
+        The sequence numbers given to scheduled events.
+    """
+
+    def __init__(self):
+        """Initialize an empty EventQueue.
+
+        @type self: EventQueue
+        @rtype: None
+        """
+        self._heap = []
+        self._seq = itertools.count()
+
+    def __len__(self):
+        """Get the number of scheduled events.
+
+        @type self: EventQueue
+        @rtype: int
+            The number of events in the queue.
+        """
+        return len(self._heap)
+
+    def put(self, event):
+        """Schedule an event.
+
+        @type self: EventQueue
+        @type event: Event
+            The event to schedule.
+        @rtype: None
+        """
+        heapq.heappush(self._heap,
+                       (event.timestamp, next(self._seq), event))
+
+    def get(self):
+        """Remove and return the earliest scheduled event.
+
+        @type self: EventQueue
+        @rtype: Event
+            The event with the smallest timestamp.
+        """
+        return heapq.heappop(self._heap)[2]
+
+    def empty(self):
+        """Get if there are no scheduled events.
+
+        @type self: EventQueue
+        @rtype: bool
+            If the queue is empty.
+        """
+        return len(self._heap) == 0
+
+    def run(self, store):
+        """Perform the scheduled events in order until none are left.
+
+        The events each one spawns are scheduled as it is performed.
+
+        @type self: EventQueue
+        @type store: GroceryStore
+            The grocery store the events act on.
+        @rtype: None
+        """
+        # Drive the heap directly rather than through get/put to save two
+        # Python-level calls per event.
+        heap = self._heap
+        seq = self._seq
+        heappush, heappop = heapq.heappush, heapq.heappop
+        while heap:
+            for future_event in heappop(heap)[2].do(store):
+                heappush(heap,
+                         (future_event.timestamp, next(seq), future_event))
 
 class Simulator:
     """A grocery store Simulator.
@@ -9,9 +93,9 @@ class Simulator:
     The Simulator sets up and runs a simulation to obtain several metrics.
     
     === Attributes ===
-    @type events: PriorityQueue[Event]
+    @type events: EventQueue
         A sequence of events arranged in priority determined by the event
-        sorting order.
+        timestamps.
     @type store: GroceryStore
         The grocery store associated with the simulator.
     @type random_state: int
@@ -28,7 +112,7 @@ class Simulator:
             A mapping from each checkout line type to how many there are.
         @rtype: None
         """
-        self.events = PriorityQueue()
+        self.events = EventQueue()
         self.store = GroceryStore(store_config)
         self.random_state = random_state
         self._finished = False
@@ -49,15 +133,15 @@ class Simulator:
         
         if self.random_state is not None:
             np.random.seed(self.random_state)
+        # Drop draws buffered by earlier runs so this run starts from the
+        # current state of np.random, however it was seeded.
+        Utility.reset_random_buffer()
 
         initial_events = create_event_list(initial_events_str, self.store)
         for event in initial_events:
             self.events.put(event)
 
-        while not self.events.empty():
-            future_events = self.events.get().do(self.store)
-            for future_event in future_events:
-                self.events.put(future_event)
+        self.events.run(self.store)
         
         self._finished = True
     
@@ -103,39 +187,35 @@ class Simulator:
         start_time = 0 if start_time is None else start_time
         end_time = float("inf") if end_time is None else end_time
         
-        customers = []
-        for line in self.store.lines:
-            if line_ids is None or line.id in line_ids:
-                for customer in line.served:
-                    customer_timestamp = None
-                    if filter_by == "join":
-                        customer_timestamp = customer.join_timestamp
-                    elif filter_by == "begin":
-                        customer_timestamp = customer.begin_timestamp
-                    elif filter_by == "finish":
-                        customer_timestamp = customer.finish_timestamp
-                    else:
-                        raise ValueError("Error: unknown filter_by: %s.", filter_by)
-                    if start_time <= customer_timestamp < end_time:
-                        customers.append(customer)
+        timestamp_columns = {"join": 0, "begin": 1, "finish": 2}
+        criterion_columns = {
+            "wait": (1, 0),
+            "checkout": (2, 1),
+            "total": (2, 0)
+        }
+        if filter_by not in timestamp_columns:
+            raise ValueError("Error: unknown filter_by: %s." % filter_by)
+        if criterion not in criterion_columns:
+            raise ValueError("Error: unknown criterion: %s." % criterion)
+        
+        stats = np.concatenate([np.empty((0, 5), dtype=np.int64)] + [
+            line.get_served_stats() for line in self.store.lines
+            if line_ids is None or line.id in line_ids])
         
-        raw_time = []
-        for customer in customers:
-            if criterion == "wait":
-                raw_time.append(customer.begin_timestamp - customer.join_timestamp)
-            elif criterion == "checkout":
-                raw_time.append(customer.finish_timestamp - customer.begin_timestamp)
-            elif criterion == "total":
-                raw_time.append(customer.finish_timestamp - customer.join_timestamp)
-            else:
-                raise ValueError("Error: unknown criterion: %s.", criterion)
+        customer_timestamps = stats[:, timestamp_columns[filter_by]]
+        mask = (start_time <= customer_timestamps) \
+        & (customer_timestamps < end_time)
         
-        np_raw_time = np.array(raw_time)
+        # Mask only the two columns needed rather than every row in full.
+        end_column, start_column = criterion_columns[criterion]
+        np_raw_time = stats[mask, end_column] - stats[mask, start_column]
+        num_customers = len(np_raw_time)
+        total_time = np_raw_time.sum()
         return ((
-            len(customers),
-            np_raw_time.sum(),
+            num_customers,
+            total_time,
             np_raw_time.min(),
             np_raw_time.max(),
-            np_raw_time.mean(),
+            total_time / num_customers,
             np_raw_time.std()
-        ), raw_time)
+        ), np_raw_time.tolist())
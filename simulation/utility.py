@@ -1,4 +1,303 @@
 import numpy as np
+from array import array
+from ._pickers_nb import _INT64_MAX, pick_least as _pick_least_nb
+
+# Buffered uniform draws in [0, 1) taken from np.random in bulk, so schemes
+# that need one random number per customer avoid a numpy call each.
+_random_buffer = []
+_random_index = 0
+# Buffered standard normal draws, likewise.
+_normal_buffer = []
+_normal_index = 0
+
+
+def reset_random_buffer():
+    """Discard the buffered random draws.
+
+    Call this after seeding np.random so later draws follow the seed.
+
+    @rtype: None
+    """
+    global _random_buffer, _random_index, _normal_buffer, _normal_index
+    _random_buffer = []
+    _random_index = 0
+    _normal_buffer = []
+    _normal_index = 0
+
+
+def _next_random():
+    """Get the next uniform random number in [0, 1).
+
+    @rtype: float
+        A uniform random number.
+    """
+    global _random_buffer, _random_index
+    if _random_index == len(_random_buffer):
+        _random_buffer = np.random.random(1 << 16).tolist()
+        _random_index = 0
+    draw = _random_buffer[_random_index]
+    _random_index += 1
+    return draw
+
+
+def _next_normal():
+    """Get the next standard normal random number.
+
+    @rtype: float
+        A random number from the standard normal distribution.
+    """
+    global _normal_buffer, _normal_index
+    if _normal_index == len(_normal_buffer):
+        _normal_buffer = np.random.standard_normal(1 << 16).tolist()
+        _normal_index = 0
+    draw = _normal_buffer[_normal_index]
+    _normal_index += 1
+    return draw
+
+
+def get_checkout_time_deterministic(customer, line):
+    """Get the checkout time given the customer and the line.
+
+    This implementation assumes the checkout time for each customer is
+    deterministic given number of items purchased.
+
+    @type customer: Customer
+        The customer to checkout.
+    @type line: CheckoutLine
+        The checkout line used for checkout.
+    @rtype: int
+        The time used for checkout.
+    """
+    type_id = line.type_id
+    if type_id < 0:
+        raise ValueError("Error: unknown checkout line type:",
+                        line.type)
+    return customer.num_items * Utility._checkout_w[type_id] + \
+    Utility._checkout_b[type_id]
+
+
+def get_checkout_times_batch(num_items, type_ids):
+    """Get the deterministic checkout times of a batch of customers.
+
+    This is the vectorized counterpart of get_checkout_time_deterministic.
+    Batches of fewer than 32 customers are computed one by one, since
+    numpy's per-call overhead outweighs the work there. Raise a ValueError
+    if the inputs differ in length or a type ID is not in
+    Utility.line_type_ids.
+
+    @type num_items: np.ndarray[int]
+        Number of grocery items each customer purchases.
+    @type type_ids: np.ndarray[int]
+        The type ID of the line each customer checks out at.
+    @rtype: np.ndarray[int64]
+        The time used for checkout by each customer.
+    """
+    num_items = np.asarray(num_items)
+    type_ids = np.asarray(type_ids)
+    if len(num_items) != len(type_ids):
+        raise ValueError("Error: num_items and type_ids differ in length.")
+    if len(type_ids) != 0 and (type_ids.min() < 0
+                               or type_ids.max() >= len(Utility._checkout_w)):
+        raise ValueError("Error: unknown checkout line type ID.")
+    if len(type_ids) < 32:
+        return np.array([
+            items * Utility._checkout_w[type_id] + \
+            Utility._checkout_b[type_id]
+            for items, type_id in zip(num_items.tolist(), type_ids.tolist())
+        ], dtype=np.result_type(num_items, np.int64))
+    return num_items * np.take(Utility._checkout_w, type_ids) \
+    + np.take(Utility._checkout_b, type_ids)
+
+
+def get_checkout_time_stochastic(customer, line):
+    """Get the checkout time given the customer and the line.
+
+    This implementation assumes the checkout time for each customer is
+    stochastic (normally distributed) given number of items purchased.
+    The mean is the deterministic checkout time and the standard deviation
+    is Utility.checkout_sigma. The time is rounded and at least 1.
+
+    @type customer: Customer
+        The customer to checkout.
+    @type line: CheckoutLine
+        The checkout line used for checkout.
+    @rtype: int
+        The time used for checkout.
+    """
+    mean = get_checkout_time_deterministic(customer, line)
+    return max(1, round(mean + Utility.checkout_sigma * _next_normal()))
+
+
+def get_checkout_times_stochastic_batch(num_items, type_ids, sigma=None):
+    """Get the stochastic checkout times of a batch of customers.
+
+    This is the vectorized counterpart of get_checkout_time_stochastic,
+    drawing the noise for the whole batch from np.random at once.
+
+    @type num_items: np.ndarray[int]
+        Number of grocery items each customer purchases.
+    @type type_ids: np.ndarray[int]
+        The type ID of the line each customer checks out at.
+    @type sigma: float
+        The standard deviation of the checkout times.
+        Default Utility.checkout_sigma.
+    @rtype: np.ndarray[int64]
+        The time used for checkout by each customer.
+    """
+    if sigma is None:
+        sigma = Utility.checkout_sigma
+    mean = get_checkout_times_batch(num_items, type_ids)
+    noise = sigma * np.random.standard_normal(mean.shape)
+    return np.maximum(1, np.rint(mean + noise).astype(np.int64))
+
+
+_NO_APPLICABLE_LINE = \
+    "Error: to pick a line when all lines are closed/not applicable."
+
+
+def _get_applicable_lines(customer, store):
+    """Get which checkout lines the customer may pick.
+
+    @type customer: Customer
+    @type store: GroceryStore
+    @rtype: np.ndarray[bool]
+        If each checkout line is open, and not an express line when the
+        customer has more than 10 items.
+    """
+    applicable = ~store.line_closed
+    if customer.num_items > 10:
+        applicable &= store.line_not_express
+    return applicable
+
+
+def _get_applicable_mask(customer, store):
+    """Get a bitmask of the checkout lines the customer may pick.
+
+    Raise a ValueError if there is no line the customer may pick.
+
+    @type customer: Customer
+    @type store: GroceryStore
+    @rtype: int
+        A bitmask of the open checkout lines, restricted to non-express
+        lines when the customer has more than 10 items; bit i is set if
+        the line with ID i may be picked.
+    """
+    applicable = store.open_mask
+    if customer.num_items > 10:
+        applicable &= store.non_express_mask
+    if not applicable:
+        raise ValueError(_NO_APPLICABLE_LINE)
+    return applicable
+
+
+def _pick_checkout_line_least(customer, store, metric):
+    """Pick the applicable checkout line with the least metric.
+
+    Ties go to the line with the smallest ID. Uses the compiled kernel
+    when numba is installed, numpy otherwise. Raise a ValueError if there
+    is no line the customer may pick.
+
+    @type customer: Customer
+    @type store: GroceryStore
+    @type metric: np.ndarray[int64]
+        The value to minimize, indexed by line ID.
+    @rtype: CheckoutLine
+        The checkout line to use for checkout.
+    """
+    if _pick_least_nb is not None:
+        line_id = _pick_least_nb(store.line_closed, store.line_is_express,
+                                 metric, customer.num_items)
+        if line_id < 0:
+            raise ValueError(_NO_APPLICABLE_LINE)
+        return store.lines[line_id]
+    masked = np.where(_get_applicable_lines(customer, store), metric,
+                      _INT64_MAX)
+    line_id = masked.argmin()
+    if masked[line_id] == _INT64_MAX:
+        raise ValueError(_NO_APPLICABLE_LINE)
+    return store.lines[line_id]
+
+
+def pick_checkout_line_least_person(customer, store):
+    """Pick a checkout line given the customer and checkout lines.
+
+    This is the least person implementation.
+
+    @type customer: Customer
+    @type store: GroceryStore
+    @rtype: CheckoutLine
+        The checkout line to use for checkout.
+    """
+    return _pick_checkout_line_least(customer, store, store.line_num_customers)
+
+
+def pick_checkout_line_pure_random(customer, store):
+    """Pick a checkout line given the customer and checkout lines.
+
+    This is the pure random implementation.
+
+    @type customer: Customer
+    @type store: GroceryStore
+    @rtype: CheckoutLine
+        The checkout line to use for checkout.
+    """
+    applicable = _get_applicable_mask(customer, store)
+    line_ids = [line_id for line_id in range(applicable.bit_length())
+                if applicable >> line_id & 1]
+    return store.lines[line_ids[int(_next_random() * len(line_ids))]]
+
+
+def pick_checkout_line_least_item(customer, store):
+    """Pick a checkout line given the customer and checkout lines.
+
+    This is the least item implementation.
+
+    @type customer: Customer
+    @type store: GroceryStore
+    @rtype: CheckoutLine
+        The checkout line to use for checkout.
+    """
+    return _pick_checkout_line_least(customer, store, store.line_num_items)
+
+
+def pick_checkout_line_least_time(customer, store):
+    """Pick a checkout line given the customer and checkout lines.
+
+    This is the least time implementation.
+
+    @type customer: Customer
+    @type store: GroceryStore
+    @rtype: CheckoutLine
+        The checkout line to use for checkout.
+    """
+    queue_time = store.line_queue_time if Utility.count_first \
+    else store.line_queue_time_after_first
+    return _pick_checkout_line_least(customer, store, queue_time)
+
+
+def pick_checkout_line_round_robin(customer, store):
+    """Pick a checkout line given the customer and checkout lines.
+
+    This is the round robin implementation.
+
+    @type customer: Customer
+    @type store: GroceryStore
+    @rtype: CheckoutLine
+        The checkout line to use for checkout.
+    """
+    applicable = _get_applicable_mask(customer, store)
+    # x & -x keeps only the lowest set bit of x. Take the first applicable
+    # line after the last picked one, else wrap around to the first
+    # applicable line.
+    last_line_id = store.last_line_id
+    after_last = applicable >> (last_line_id + 1)
+    if after_last:
+        line_id = last_line_id + (after_last & -after_last).bit_length()
+    else:
+        line_id = (applicable & -applicable).bit_length() - 1
+    store.last_line_id = line_id
+    return store.lines[line_id]
+
 
 class Utility:
     """ A class containing useful utility functions.
@@ -31,10 +330,16 @@ class Utility:
         The implementation can differ to experiment different settings.
     
     
-    @type _checkout_w: dict[str, int]
-        weight of linear function to model checkout time
-    @type _checkout_b: dict[str, int]
-        bias of linear function to model checkout time
+    @type line_type_ids: dict[str, int]
+        the integer ID of each checkout line type, used to index
+        _checkout_w and _checkout_b
+    @type _checkout_w: array[int64]
+        weight of linear function to model checkout time, by line type ID
+    @type _checkout_b: array[int64]
+        bias of linear function to model checkout time, by line type ID
+    @type checkout_sigma: float
+        standard deviation of the stochastic checkout time
+        Default 1.0
     @type count_first: bool
         if count the first customer in a checkout line
         Default True
@@ -43,165 +348,35 @@ class Utility:
     get_checkout_time = None
     pick_checkout_line = None
     
-    _checkout_w = {
-        "cashier": 1,
+    line_type_ids = {
+        "cashier": 0,
         "express": 1,
         "self":    2
     }
-    _checkout_b = {
-        "cashier": 7,
-        "express": 4,
-        "self":    1
-    }
-    
-    count_first = True
+    #                        cashier express self
+    _checkout_w = array("q", (1,      1,      2))
+    _checkout_b = array("q", (7,      4,      1))
     
-    @staticmethod
-    def get_checkout_time_deterministic(customer, line):
-        """Get the checkout time given the customer and the line.
-
-        This implementation assumes the checkout time for each customer is
-        deterministic given number of items purchased.
-
-        @type customer: Customer
-            The customer to checkout.
-        @type line: CheckoutLine
-            The checkout line used for checkout.
-        @rtype: int
-            The time used for checkout.
-        """
-        if line.type in ("cashier", "express", "self"):
-            return customer.num_items * Utility._checkout_w[line.type] + \
-        Utility._checkout_b[line.type]
-        else:
-            raise ValueError("Error: unknown checkout line type:",
-                            line.type)
+    checkout_sigma = 1.0
     
-    @staticmethod
-    def get_checkout_time_stochastic(customer, line):
-        """Get the checkout time given the customer and the line.s
-
-        This implementation assumes the checkout time for each customer is
-        stochastic (normally distributed) given number of items purchased.
-
-        @type customer: Customer
-            The customer to checkout.
-        @type line: CheckoutLine
-            The checkout line used for checkout.
-        @rtype: int
-            The time used for checkout.
-        """
-        # TODO: implement this method.
-        
-        raise NotImplementedError("Method not implemented.")
-
-    @staticmethod
-    def pick_checkout_line_least_person(customer, store):
-        """Pick a checkout line given the customer and checkout lines.
-        
-        This is the least person implementation.
-
-        @type customer: Customer
-        @type store: GroceryStore
-        @rtype: CheckoutLine
-            The checkout line to use for checkout.
-        """
-        best_line = None
-        for line in store.lines:
-            if not line.closed and (
-                line.type != "express" or customer.num_items <= 10) and (
-                best_line is None or
-                line.get_num_customers() < best_line.get_num_customers()):
-                best_line = line
-        assert best_line is not None, \
-        "Error: to pick a line when all lines are closed/not applicable."
-        return best_line
-    
-    @staticmethod
-    def pick_checkout_line_pure_random(customer, store):
-        """Pick a checkout line given the customer and checkout lines.
-        
-        This is the pure random implementation.
-
-        @type customer: Customer
-        @type store: GroceryStore
-        @rtype: CheckoutLine
-            The checkout line to use for checkout.
-        """
-        lines_avail = []
-        for line in store.lines:
-            if not line.closed and (
-                line.type != "express" or customer.num_items <= 10):
-                lines_avail.append(line)
-        assert len(lines_avail) != 0, \
-        "Error: to pick a line when all lines are closed/not applicable."
-        return lines_avail[np.random.randint(len(lines_avail))]
-    
-    @staticmethod
-    def pick_checkout_line_least_item(customer, store):
-        """Pick a checkout line given the customer and checkout lines.
-        
-        This is the least item implementation.
-
-        @type customer: Customer
-        @type store: GroceryStore
-        @rtype: CheckoutLine
-            The checkout line to use for checkout.
-        """
-        best_line = None
-        for line in store.lines:
-            if not line.closed and (
-                line.type != "express" or customer.num_items <= 10) and (
-                best_line is None or
-                line.get_num_items() < best_line.get_num_items()):
-                best_line = line
-        assert best_line is not None, \
-        "Error: to pick a line when all lines are closed/not applicable."
-        return best_line
-    
-    @staticmethod
-    def pick_checkout_line_least_time(customer, store):
-        """Pick a checkout line given the customer and checkout lines.
-        
-        This is the least time implementation.
-
-        @type customer: Customer
-        @type store: GroceryStore
-        @rtype: CheckoutLine
-            The checkout line to use for checkout.
-        """
-        best_line = None
-        for line in store.lines:
-            if not line.closed and (
-                line.type != "express" or customer.num_items <= 10) and (
-                best_line is None or
-                line.get_queue_time(count_first=Utility.count_first) \
-                < best_line.get_queue_time(count_first=Utility.count_first)):
-                best_line = line
-        assert best_line is not None, \
-        "Error: to pick a line when all lines are closed/not applicable."
-        return best_line
+    count_first = True
     
-    @staticmethod
-    def pick_checkout_line_round_robin(customer, store):
-        """Pick a checkout line given the customer and checkout lines.
-        
-        This is the round robin implementation.
-
-        @type customer: Customer
-        @type store: GroceryStore
-        @rtype: CheckoutLine
-            The checkout line to use for checkout.
-        """
-        next_line = None
-        for offset in range(1, store.total_lines+1):
-            line_id = (store.last_line_id + offset) % store.total_lines
-            line = store.lines[line_id]
-            if not line.closed and (
-                line.type != "express" or customer.num_items <= 10):
-                next_line = line
-                break
-        assert next_line is not None, \
-        "Error: to pick a line when all lines are closed/not applicable."
-        store.last_line_id = next_line.id
-        return next_line
+    # The schemes are module-level functions that call each other
+    # directly; they are also exposed here so a scheme can be selected
+    # with e.g.
+    #     Utility.pick_checkout_line = Utility.pick_checkout_line_least_time
+    reset_random_buffer = staticmethod(reset_random_buffer)
+    get_checkout_time_deterministic = \
+        staticmethod(get_checkout_time_deterministic)
+    get_checkout_times_batch = staticmethod(get_checkout_times_batch)
+    get_checkout_time_stochastic = staticmethod(get_checkout_time_stochastic)
+    get_checkout_times_stochastic_batch = \
+        staticmethod(get_checkout_times_stochastic_batch)
+    pick_checkout_line_least_person = \
+        staticmethod(pick_checkout_line_least_person)
+    pick_checkout_line_pure_random = \
+        staticmethod(pick_checkout_line_pure_random)
+    pick_checkout_line_least_item = staticmethod(pick_checkout_line_least_item)
+    pick_checkout_line_least_time = staticmethod(pick_checkout_line_least_time)
+    pick_checkout_line_round_robin = \
+        staticmethod(pick_checkout_line_round_robin)